@@ -16,14 +16,21 @@ See https://doi.org/10.1093/llc/fqac079
 # %%
 import os
 import re
-from functools import partial
+import heapq
+from array import array
 import tarfile
+import atexit
+import threading
+import queue
 import time
-from multiprocessing import Pool, cpu_count
+from multiprocessing import Pool, SimpleQueue, cpu_count
+from concurrent.futures import ThreadPoolExecutor
 import logging
 import json
 import argparse
+from io import BytesIO
 from lxml import etree as ET
+import numpy as np
 import pandas as pd
 from tqdm import tqdm
 import importlib.util
@@ -51,8 +58,23 @@ def check_parquet_dependencies():
 
 # Check for parquet dependencies before proceeding
 parquet_engine = check_parquet_dependencies()
+if parquet_engine == "pyarrow":
+    import pyarrow as pa
+    import pyarrow.parquet as pq
 logging.info(f"Using {parquet_engine} for parquet file operations")
 
+# Use indexed_gzip for reading tar files if it is installed (optional). It records
+# seek points while decompressing, so going back to an earlier member of an archive
+# does not restart decompression from the beginning of the file
+indexed_gzip_available = importlib.util.find_spec("indexed_gzip") is not None
+if indexed_gzip_available:
+    import indexed_gzip
+
+# Use orjson for writing the summary JSON if it is installed (optional)
+orjson_available = importlib.util.find_spec("orjson") is not None
+if orjson_available:
+    import orjson
+
 # Set up logging
 logging.basicConfig(
     level=logging.INFO,
@@ -63,15 +85,197 @@ logging.basicConfig(
     ]
 )
 
+# Checked once so debug messages in per-page and per-article code cost a single test
+_DEBUG = logging.getLogger().isEnabledFor(logging.DEBUG)
+
 # Load METS namespace
 # http://www.loc.gov/standards/mets/namespace.html
 NS = {
     "mets": "http://www.loc.gov/METS/",
-    # Code is ALTO namespace agnostic and will handle various implementations using local.name()
+    # Code is ALTO namespace agnostic: the namespace is detected per page, and pages
+    # without one are matched with the {*} wildcard tags in _LOCAL_NAME_TAGS
 }
+METS_DIV = f"{{{NS['mets']}}}div"
+METS_AREA = f"{{{NS['mets']}}}area"
+
+# Maximum number of threads used to parse the ALTO pages of a single issue
+MAX_PAGE_THREADS = 4
+
+# Number of balanced bins of issues per worker
+BINS_PER_WORKER = 4
+
+# Columns of the output dataframe, one row per article
+ISSUE_COLUMNS = [
+    "mets_title",           # Original METS title
+    "title_text",           # Title text from ALTO
+    "text",                 # Content text from ALTO
+    "title_line_widths",    # Width of each line in title
+    "title_line_heights",   # Height of each line in title
+    "title_line_hpos",      # HPOS of each line in title
+    "title_line_vpos",      # VPOS of each line in title
+    "title_block_hpos",     # HPOS of each block in title
+    "title_block_vpos",     # VPOS of each block in title
+    "title_block_widths",   # Width of each block in title
+    "title_block_heights",  # Height of each block in title
+    "title_confidences",    # Word confidences in title
+    "title_block_ids",      # Block IDs for title
+    "line_widths",          # Width of each line in content
+    "line_heights",         # Height of each line in content
+    "line_hpos",            # HPOS of each line in content
+    "line_vpos",            # VPOS of each line in content
+    "block_hpos",           # HPOS of each block in content
+    "block_vpos",           # VPOS of each block in content
+    "block_widths",         # Width of each block in content
+    "block_heights",        # Height of each block in content
+    "word_confidences",     # Word confidences in content
+    "block_ids",            # Block IDs for content
+    "non_text_elements",    # List of each non-text element found (including duplicates)
+]
+
+# Name pandas gives the (article ID) index column in parquet files
+INDEX_COLUMN = "__index_level_0__"
+
+# Optional struct layout (--struct-layout): the four layout columns of each group of
+# lines or blocks are stored as one list of structs with these fields
+LAYOUT_STRUCT_FIELDS = ["hpos", "vpos", "width", "height"]
+LAYOUT_STRUCT_GROUPS = {
+    "title_lines": ["title_line_hpos", "title_line_vpos", "title_line_widths", "title_line_heights"],
+    "title_blocks": ["title_block_hpos", "title_block_vpos", "title_block_widths", "title_block_heights"],
+    "lines": ["line_hpos", "line_vpos", "line_widths", "line_heights"],
+    "blocks": ["block_hpos", "block_vpos", "block_widths", "block_heights"],
+}
+STRUCT_ISSUE_COLUMNS = [
+    "mets_title",
+    "title_text",
+    "text",
+    "title_lines",          # HPOS, VPOS, width and height of each line in title
+    "title_blocks",         # HPOS, VPOS, width and height of each block in title
+    "title_confidences",
+    "title_block_ids",
+    "lines",                # HPOS, VPOS, width and height of each line in content
+    "blocks",               # HPOS, VPOS, width and height of each block in content
+    "word_confidences",
+    "block_ids",
+    "non_text_elements",
+]
+
+if parquet_engine == "pyarrow":
+    # Fixed Arrow schema for the output files, so column types are not inferred on every write.
+    # The pandas metadata lets pd.read_parquet() restore the article IDs as the index.
+    _int_list = pa.list_(pa.int32())
+    _float_list = pa.list_(pa.float32())
+    _string_list = pa.list_(pa.string())
+    ISSUE_ARROW_SCHEMA = pa.schema(
+        [
+            ("mets_title", pa.string()),
+            ("title_text", pa.string()),
+            ("text", pa.string()),
+            ("title_line_widths", _int_list),
+            ("title_line_heights", _int_list),
+            ("title_line_hpos", _int_list),
+            ("title_line_vpos", _int_list),
+            ("title_block_hpos", _int_list),
+            ("title_block_vpos", _int_list),
+            ("title_block_widths", _int_list),
+            ("title_block_heights", _int_list),
+            ("title_confidences", _float_list),
+            ("title_block_ids", _string_list),
+            ("line_widths", _int_list),
+            ("line_heights", _int_list),
+            ("line_hpos", _int_list),
+            ("line_vpos", _int_list),
+            ("block_hpos", _int_list),
+            ("block_vpos", _int_list),
+            ("block_widths", _int_list),
+            ("block_heights", _int_list),
+            ("word_confidences", _float_list),
+            ("block_ids", _string_list),
+            ("non_text_elements", _string_list),
+            (INDEX_COLUMN, pa.string()),
+        ],
+        metadata = pa.Schema.from_pandas(
+            pd.DataFrame(columns = ISSUE_COLUMNS, index = pd.Index([], dtype = object)),
+            preserve_index = True
+        ).metadata
+    )
+
+    _layout_list = pa.list_(pa.struct([(name, pa.int32()) for name in LAYOUT_STRUCT_FIELDS]))
+    STRUCT_ISSUE_ARROW_SCHEMA = pa.schema(
+        [
+            (name, _layout_list if name in LAYOUT_STRUCT_GROUPS else ISSUE_ARROW_SCHEMA.field(name).type)
+            for name in STRUCT_ISSUE_COLUMNS
+        ] + [(INDEX_COLUMN, pa.string())],
+        metadata = pa.Schema.from_pandas(
+            pd.DataFrame(columns = STRUCT_ISSUE_COLUMNS, index = pd.Index([], dtype = object)),
+            preserve_index = True
+        ).metadata
+    )
+
+# Tags of the ALTO elements read per block, matched with element.iter() which is
+# faster than an equivalent XPath query. The wildcard tags match any namespace and
+# are only used for pages where no ALTO namespace could be detected.
+_LOCAL_NAME_TAGS = {"string": "{*}String", "line": "{*}TextLine"}
+
+# Namespaced tags built once per ALTO namespace URI
+_ALTO_TAGS = {}
+
+def get_alto_tags(alto_ns):
+    """
+    Return the String and TextLine tags in the given ALTO namespace,
+    building them on first use.
+
+    Args:
+        alto_ns: ALTO namespace URI
+
+    Returns:
+        Dictionary with "string" and "line" namespaced tag names
+    """
+    tags = _ALTO_TAGS.get(alto_ns)
+    if tags is None:
+        tags = {
+            "string": f"{{{alto_ns}}}String",
+            "line": f"{{{alto_ns}}}TextLine",
+        }
+        _ALTO_TAGS[alto_ns] = tags
+    return tags
+
+# Precompiled patterns used by clean_text
+_ESCAPE_RE = re.compile(r'\\([\'"\n\r\t])')
+_NUM_HYPHEN_RE = re.compile(r"(\d+'?)\s+-(?!-)")
+
+# Whitespace characters other than the space that str.split() splits on
+_ASCII_OTHER_WHITESPACE = "\t\n\x0b\x0c\r\x1c\x1d\x1e\x1f"
+_OTHER_WHITESPACE = (_ASCII_OTHER_WHITESPACE + "\x85\xa0\u1680\u2000\u2001\u2002\u2003\u2004"
+                     "\u2005\u2006\u2007\u2008\u2009\u200a\u2028\u2029\u202f\u205f\u3000")
+
+# Page XML file names within an issue directory, e.g. .../0001.xml
+_PAGE_NUM_RE = re.compile(r"/(\d+)\.xml$")
+
+# Page number prefix of METS block IDs, e.g. P1_TB00001
+_PAGE_RE = re.compile(r"P(\d+)_")
+
+# ALTO element names for the block type code following the page prefix
+_BLOCK_KIND = {"TB": "TextBlock", "CB": "ComposedBlock"}
+
+# Newspaper code and year of a year archive, e.g. CHP_1903.tar.gz
+_TAR_RE = re.compile(r"([A-Z]+)_(\d{4})\.tar\.gz")
 
 # %%
-def clean_text(text):
+def _is_single_spaced(text):
+    """
+    Return True if text has no leading, trailing or repeated whitespace and no
+    whitespace other than single spaces, i.e. splitting and re-joining it on
+    whitespace would not change it.
+    """
+    if "  " in text or text[:1].isspace() or text[-1:].isspace():
+        return False
+    other_whitespace = _ASCII_OTHER_WHITESPACE if text.isascii() else _OTHER_WHITESPACE
+    for char in other_whitespace:
+        if char in text:
+            return False
+    return True
+
+def clean_text(text, _escape_re = _ESCAPE_RE, _num_hyphen_re = _NUM_HYPHEN_RE):
     """
     Normalises and cleans text by handling special characters and standardising spacing.
     - Converts non-string inputs to strings
@@ -91,25 +295,185 @@ def clean_text(text):
     if not isinstance(text, str):
         return "" if text is None else str(text)
 
-    # Replace escape sequences using regular expression
-    text = re.sub(r'\\([\'"\n\r\t])',
-                 lambda m: ' ' if m.group(1) in 'nrt' else m.group(1),
-                 text)
-
-    # Protect consecutive hyphens by marking them
-    text = re.sub(r'(\-{2,})', lambda m: f'__HYPHEN_{len(m.group(1))}__', text)
-    # Protect number-hyphen sequences
-    text = re.sub(r'(\d+\'?)(\s+)(\-+)', r'\1__NUMHYPH__\3', text)
-    text = " ".join(text.split())
-    # Restore consecutive hyphens
-    text = re.sub(r'__HYPHEN_(\d+)__', lambda m: '-' * int(m.group(1)), text)
-    # Restore number-hyphen connections
-    text = re.sub(r'__NUMHYPH__', '-', text)
-    # Fix spacing around multiple consecutive hyphens
-    text = re.sub(r'(\d+\'?)-(\-+)', r'\1-\2', text)
+    # Remove the backslash from escaped quotes and whitespace characters
+    if "\\" in text:
+        text = _escape_re.sub(r"\1", text)
+
+    # Attach a single hyphen to a preceding number, e.g. "12 -" becomes "12--"
+    # (runs of two or more hyphens are preserved as-is)
+    if "-" in text:
+        text = _num_hyphen_re.sub(r"\1--", text)
+
+    # Remove redundant spaces, unless the text is already single spaced
+    if not _is_single_spaced(text):
+        text = " ".join(text.split())
 
     return text
 
+# %%
+def nearest_divs(element):
+    """
+    Yield the mets:div elements below a non-div element that have no other
+    mets:div between them and the element, in document order. Used to look
+    through fptr and other wrappers, including ones left by recover mode.
+    """
+    for child in element:
+        if child.tag == METS_DIV:
+            yield child
+        else:
+            yield from nearest_divs(child)
+
+def collect_article_blocks(article, exclude_content_types):
+    """
+    Walk the divs of a METS article once and classify each div by its TYPE:
+    - Areas inside HEADING divs are title blocks
+    - Direct areas of other typed divs (except excluded types) are content blocks,
+      ordered by the div's ORDER attribute
+    - Types of the article's child divs and their sub-divs (other than TEXT, HEADING
+      and BODY_CONTENT) are non-text elements. A BODY child is only recorded as a
+      non-text element if it has no TEXT divs. Areas of non-text sub-divs that are
+      not excluded are also collected so TABLE content etc. is kept
+    Divs are found at any depth, also below other elements (see nearest_divs)
+
+    Args:
+        article: METS div element of TYPE ARTICLE
+        exclude_content_types: Set of div types whose content is excluded
+
+    Returns:
+        Tuple of (title_block_ids, content_blocks, extra_block_ids, non_text_elements)
+        where content_blocks is a list of (block_id, order_value) tuples in document
+        order and extra_block_ids holds the non-text sub-div block IDs in document order
+    """
+    title_block_ids = []
+    seen_title_ids = set()
+    content_blocks = []
+    extra_block_ids = []
+    non_text_elements = []
+
+    def walk(div, in_heading, is_child, in_non_text, in_extra):
+        """Process a div and its descendant divs. Returns True if a TEXT div was found."""
+        div_type = div.get("TYPE", "")
+        has_text = div_type == "TEXT"
+
+        # Title blocks: all areas below the outermost HEADING div
+        if div_type == "HEADING" and not in_heading:
+            for area in div.iter(METS_AREA):
+                block_id = area.get("BEGIN")
+                if block_id and block_id not in seen_title_ids:
+                    seen_title_ids.add(block_id)
+                    title_block_ids.append(block_id)
+            in_heading = True
+
+        # Content blocks: direct areas of typed divs other than HEADING and excluded types
+        collect_content = bool(div_type) and div_type != "HEADING" and div_type not in exclude_content_types
+        if collect_content:
+            # Get order value for sequencing
+            order_str = div.get("ORDER", "999")  # Default high value if not specified
+            try:
+                order_val = int(order_str)
+            except ValueError:
+                order_val = 999
+
+        # Non-text elements
+        body_position = None
+        if is_child:
+            in_non_text = bool(div_type) and div_type != "HEADING"
+            if in_non_text:
+                if div_type == "BODY":
+                    # Only recorded if the BODY has no TEXT divs (checked after the walk)
+                    body_position = len(non_text_elements)
+                else:
+                    non_text_elements.append(div_type)
+        elif in_non_text and div_type and div_type not in ("TEXT", "HEADING", "BODY_CONTENT"):
+            non_text_elements.append(div_type)
+
+            # If this is a TABLE, etc., keep its block IDs as content
+            # But EXCLUDE content from specified types
+            if div_type not in exclude_content_types and not in_extra:
+                for area in div.iter(METS_AREA):
+                    block_id = area.get("BEGIN")
+                    if block_id:
+                        extra_block_ids.append(block_id)
+                in_extra = True
+
+        # Direct areas of this div come before those of its descendant divs
+        child_divs = []
+        for child in div:
+            if child.tag == METS_DIV:
+                child_divs.append(child)
+            elif child.tag == METS_AREA:
+                if collect_content:
+                    block_id = child.get("BEGIN")
+                    if block_id:
+                        content_blocks.append((block_id, order_val))
+            else:
+                child_divs.extend(nearest_divs(child))
+
+        for child in child_divs:
+            if walk(child, in_heading, False, in_non_text, in_extra):
+                has_text = True
+
+        if body_position is not None and not has_text:
+            non_text_elements.insert(body_position, "BODY")
+
+        return has_text
+
+    for child in article:
+        if child.tag == METS_DIV:
+            walk(child, False, True, False, False)
+        elif child.tag != METS_AREA:
+            # Divs below other elements are not child divs of the article
+            for div in nearest_divs(child):
+                walk(div, False, False, False, False)
+
+    return title_block_ids, content_blocks, extra_block_ids, non_text_elements
+
+# %%
+def add_article(art_dict, article, issue_code, exclude_content_types):
+    """
+    Extract the title, ordered text blocks and non-text elements of a single
+    ARTICLE div and add them to art_dict under the issue article ID.
+
+    Args:
+        art_dict: Dictionary of articles being built by mets2codes_inner
+        article: ARTICLE mets:div element
+        issue_code: Issue code identifier
+        exclude_content_types: Div types whose content is not extracted
+    """
+    attributes = article.attrib
+    article_id = attributes.get("DMDID", "")
+    if not article_id:
+        return  # Skip articles without an ID
+
+    article_title = attributes.get("LABEL", "UNTITLED")
+    issue_article_id = f"{issue_code}_{article_id[7:]}" if len(article_id) > 7 else f"{issue_code}_{article_id}"
+
+    # Collect heading, content and non-text blocks in a single walk of the article
+    title_block_ids, all_content_divs, extra_block_ids, non_text_elements = collect_article_blocks(
+        article, exclude_content_types)
+
+    # Sort by ORDER value
+    all_content_divs.sort(key=lambda x: x[1])
+
+    # Create a list of text block IDs in the correct order
+    text_block_ids = []
+    # Create a dictionary mapping block_id to its position in the sequence
+    order_map = {}
+
+    for idx, (block_id, _) in enumerate(all_content_divs):
+        if block_id not in order_map:
+            text_block_ids.append(block_id)
+            order_map[block_id] = idx  # Store position for later sequencing
+
+    # Blocks of TABLE, etc. sub-divs not already included are added at the end
+    for block_id in extra_block_ids:
+        if block_id not in order_map:
+            text_block_ids.append(block_id)
+            order_map[block_id] = len(order_map)
+
+    # Store with the additional order_map
+    art_dict[issue_article_id] = (article_title, title_block_ids, text_block_ids, non_text_elements, order_map)
+
 # %%
 def mets2codes_inner(text, issue_code):
     """
@@ -126,184 +490,234 @@ def mets2codes_inner(text, issue_code):
         non_text_elements, order_map) tuples where order_map provides the
         ordering information for text blocks
     """
-    # Load the mets xml file
-    parser = ET.XMLParser(remove_blank_text=True, recover=True)
+    art_dict = {}
+
+    # Define types to track their presence but exclude content
+    exclude_content_types = {"ILLUSTRATION", "IMAGE", "CAPTION"}
+
+    # Stream the METS file and handle each article as soon as its div is complete
+    context = ET.iterparse(BytesIO(text), events = ("end",), tag = METS_DIV,
+                           remove_blank_text = True, recover = True, huge_tree = True)
 
     try:
-        mets_root = ET.fromstring(text, parser)
-    except ET.XMLSyntaxError as e:
-        logging.error(f"XML parsing error for {issue_code}: {str(e)}")
-        return {}
+        for _, article in context:
+            if article.get("TYPE") != "ARTICLE":
+                continue
 
-    xpath_articles = ".//mets:div[@TYPE='ARTICLE']"
-    articles_div = mets_root.xpath(xpath_articles, namespaces=NS)
+            # Articles nested in another article (or wrapped in an unclosed one by
+            # recover mode) are left intact and handled with their outermost article
+            if any(ancestor.get("TYPE") == "ARTICLE" for ancestor in article.iterancestors(METS_DIV)):
+                continue
 
-    art_dict = {}
+            # The article and any nested ones, in document order
+            for div in article.iter(METS_DIV):
+                if div.get("TYPE") == "ARTICLE":
+                    add_article(art_dict, div, issue_code, exclude_content_types)
 
-    # Define types to track their presence but exclude content
-    exclude_content_types = {"ILLUSTRATION", "IMAGE", "CAPTION"}
+            # Free memory for the finished article and any earlier siblings
+            article.clear()
+            while article.getprevious() is not None:
+                del article.getparent()[0]
+    except ET.XMLSyntaxError as e:
+        logging.error(f"XML parsing error for {issue_code}: {str(e)}")
+        return {}
 
-    for article in articles_div:
-        attributes = article.attrib
-        article_id = attributes.get("DMDID", "")
-        if not article_id:
-            continue  # Skip articles without an ID
+    # Recover mode can stop streaming early on malformed METS without raising, so
+    # parse such files again as a whole tree, which recovers more of the articles
+    if context.error_log.filter_from_errors():
+        logging.warning(f"Malformed METS for {issue_code}, parsing it again in recover mode")
+        parser = ET.XMLParser(remove_blank_text=True, recover=True, huge_tree=True)
+        try:
+            mets_root = ET.fromstring(text, parser)
+        except ET.XMLSyntaxError as e:
+            logging.error(f"XML parsing error for {issue_code}: {str(e)}")
+            return {}
 
-        article_title = attributes.get("LABEL", "UNTITLED")
-        issue_article_id = f"{issue_code}_{article_id[7:]}" if len(article_id) > 7 else f"{issue_code}_{article_id}"
+        art_dict = {}
+        if mets_root is not None:
+            for article in mets_root.iter(METS_DIV):
+                if article.get("TYPE") == "ARTICLE":
+                    add_article(art_dict, article, issue_code, exclude_content_types)
 
-        # Extract heading blocks (as before)
-        title_block_ids = []
-        title_divs = article.xpath(".//mets:div[@TYPE='HEADING']", namespaces=NS)
-        for title_div in title_divs:
-            for area in title_div.xpath(".//mets:area", namespaces=NS):
-                block_id = area.get("BEGIN")
-                if block_id and block_id not in title_block_ids:
-                    title_block_ids.append(block_id)
+    return art_dict
 
-        # Extract text blocks - both regular TEXT blocks and others like AUTHOR
-        all_content_divs = []  # Contains (div, block_id, order_value)
+# %%
+# ALTO page parser, one per thread since lxml parsers cannot be shared between
+# threads. Reset in each worker process by init_worker
+_PARSER_LOCAL = threading.local()
+
+def get_page_parser():
+    """Return this thread's ALTO page parser, creating it on first use."""
+    parser = getattr(_PARSER_LOCAL, "parser", None)
+    if parser is None:
+        # huge_tree lifts libxml2's size limits on text nodes and tree depth, so very
+        # large pages are parsed in full rather than cut short by recover mode
+        parser = ET.XMLParser(remove_blank_text=True, recover=True, huge_tree=True)
+        _PARSER_LOCAL.parser = parser
+    return parser
+
+# ALTO page parser threads, kept for all issues processed by this process so the
+# threads and their cached parsers are reused. Created by init_worker in each
+# worker process, or on first use outside the pool
+_PAGE_EXECUTOR = None
+
+def get_page_executor():
+    """Return this process's ALTO page parser thread pool, creating it on first use."""
+    global _PAGE_EXECUTOR
+    if _PAGE_EXECUTOR is None:
+        _PAGE_EXECUTOR = ThreadPoolExecutor(max_workers = MAX_PAGE_THREADS)
+    return _PAGE_EXECUTOR
+
+# Settings shared by all issues of a batch, set once per worker process by init_worker
+# so they are not pickled with every task
+_WORKER_CTX = {}
+
+def init_worker(input_paths, output_path, rev_date, struct_layout = False, partitioned = False,
+                progress_queue = None):
+    """
+    Initialise the per-process state of a Pool worker.
 
-        # Process all divs that might contain content (everything except HEADING)
-        for div in article.xpath(".//mets:div[not(@TYPE='HEADING')]", namespaces=NS):
-            div_type = div.get("TYPE", "")
-            if not div_type:
-                continue
+    Args:
+        input_paths: List of one or more paths to the input directories
+        output_path: Path to the output directory
+        rev_date: Revision date for output files
+        struct_layout: Write the layout values as lists of structs
+        partitioned: Write the issue files into a newspaper/year partitioned dataset
+        progress_queue: Queue to report each processed issue on (optional)
+    """
+    global _PARSER_LOCAL, _PAGE_EXECUTOR
+    _PARSER_LOCAL = threading.local()
+    # Threads of a page executor copied from the parent do not exist in the worker
+    _PAGE_EXECUTOR = ThreadPoolExecutor(max_workers = MAX_PAGE_THREADS)
+    # Tar files opened by the parent must not be shared with the worker
+    _OPEN_TARS.clear()
+    _WORKER_CTX.update(input_paths = input_paths, output_path = output_path, rev_date = rev_date,
+                       struct_layout = struct_layout, partitioned = partitioned,
+                       progress_queue = progress_queue)
+    start_issue_writer()
 
-            # Skip content extraction for excluded types
-            if div_type in exclude_content_types:
-                continue
+# %%
+def parse_page(page_args):
+    """
+    Parse a single ALTO page and resolve its namespaces, block index and element tags.
+    Runs in a worker thread of parse_pages.
 
-            # Get order value for sequencing
-            order_str = div.get("ORDER", "999")  # Default high value if not specified
-            try:
-                order_val = int(order_str)
-            except ValueError:
-                order_val = 999
+    Args:
+        page_args: Tuple of (page index, XML content as bytes, page file name)
 
-            # Process direct area elements in this div
-            for area in div.xpath("./mets:area", namespaces = NS):
-                block_id = area.get("BEGIN")
-                if block_id:
-                    all_content_divs.append((div, block_id, order_val))
-
-        # Sort by ORDER value
-        all_content_divs.sort(key=lambda x: x[2])
-
-        # Create a list of text block IDs in the correct order
-        text_block_ids = []
-        # Create a dictionary mapping block_id to its position in the sequence
-        order_map = {}
-
-        for idx, (div, block_id, _) in enumerate(all_content_divs):
-            if block_id not in text_block_ids:
-                text_block_ids.append(block_id)
-                order_map[block_id] = idx  # Store position for later sequencing
-
-        # Extract non-text elements
-        non_text_elements = []
-        for child_div in article.xpath("./mets:div", namespaces = NS):
-            div_type = child_div.get("TYPE", "")
-            if div_type and div_type not in ["HEADING"]:
-                if div_type == "BODY":
-                    # For BODY, check if it has TEXT children or non-text children
-                    body_text_divs = child_div.xpath(".//mets:div[@TYPE='TEXT']", namespaces = NS)
-                    if not body_text_divs:
-                        non_text_elements.append(div_type)
-                else:
-                    non_text_elements.append(div_type)
+    Returns:
+        Tuple of (page ID, (parsed XML root, namespace dict, block ID to element dict,
+        dict of String/TextLine tags)), or None if the page could not be parsed
+    """
+    i, text, name = page_args
+    try:
+        root = ET.fromstring(text, get_page_parser())
+    except ET.XMLSyntaxError as e:
+        logging.error(f"XML parsing error for page {i+1}: {str(e)}")
+        return None
 
-                # Also capture any sub-types within this div
-                for sub_div in child_div.xpath(".//mets:div", namespaces = NS):
-                    sub_type = sub_div.get("TYPE", "")
-                    if sub_type and sub_type not in ["TEXT", "HEADING", "BODY_CONTENT"]:
-                        non_text_elements.append(sub_type)
+    # Get the original namespace map from the root
+    original_nsmap = root.nsmap.copy()
 
-                        # If this is a TABLE, etc., ensure its block IDs are in text_block_ids
-                        # But EXCLUDE content from specified types
-                        if sub_type not in exclude_content_types:
-                            for area in sub_div.xpath(".//mets:area", namespaces=NS):
-                                block_id = area.get("BEGIN")
-                                if block_id and block_id not in text_block_ids:
-                                    text_block_ids.append(block_id)
-                                    order_map[block_id] = len(order_map)  # Add at the end
+    # Create a clean namespace map for XPath (with no empty prefixes)
+    xpath_nsmap = {}
 
-        # Store with the additional order_map
-        art_dict[issue_article_id] = (article_title, title_block_ids, text_block_ids, non_text_elements, order_map)
+    # Handle default namespace (xmlns without prefix)
+    if None in original_nsmap:
+        alto_ns = original_nsmap[None]
+        # Add with 'alto' prefix for XPath queries
+        xpath_nsmap["alto"] = alto_ns
+        # Only log this at debug level
+        if _DEBUG:
+            logging.debug("Found default ALTO namespace in %s: %s", name, alto_ns)
+    else:
+        # Look for any namespace with 'alto' in the URL
+        alto_found = False
+        for prefix, uri in original_nsmap.items():
+            if "alto" in uri.lower():
+                xpath_nsmap["alto"] = uri
+                alto_found = True
+                # Only log this at debug level
+                if _DEBUG:
+                    logging.debug("Found ALTO namespace with prefix %s in %s: %s", prefix, name, uri)
+                break
 
-    # Free memory
-    mets_root.clear()
+            # Copy other namespaces as-is
+            xpath_nsmap[prefix] = uri
+
+        # If no ALTO namespace found, create a dummy one to avoid XPath errors
+        if not alto_found:
+            # Use debug level instead of warning as this is common and expected
+            if _DEBUG:
+                logging.debug("No ALTO namespace found in %s, using fallback", name)
+            xpath_nsmap["alto"] = "http://www.loc.gov/standards/alto/ns-generic"
+
+    # For any other namespaces with real prefixes, copy them
+    for prefix, uri in original_nsmap.items():
+        if prefix is not None:
+            xpath_nsmap[prefix] = uri
+
+    # Index blocks by ID in a single pass, keeping the first element for each ID
+    id_index = {}
+    for el in root.iter("{*}TextBlock", "{*}ComposedBlock"):
+        el_id = el.get("ID")
+        if el_id and el_id not in id_index:
+            id_index[el_id] = el
+
+    # Use namespaced tags when the page's elements are in the detected ALTO namespace
+    if ET.QName(root).namespace == xpath_nsmap["alto"]:
+        page_tags = get_alto_tags(xpath_nsmap["alto"])
+    else:
+        page_tags = _LOCAL_NAME_TAGS
 
-    return art_dict
+    return f"P{i+1}", (root, xpath_nsmap, id_index, page_tags)
 
 # %%
 def parse_pages(pages_tarinfo, tar):
     """
     Given list of pages as tarinfo objects, return dictionary with
-    page IDs as keys and tuples of (XML root, namespace dict) as values.
+    page IDs as keys and tuples of (XML root, namespace dict, block index, element tags) as values.
+    The block index maps each TextBlock/ComposedBlock ID to its element so blocks
+    can be looked up directly instead of searching the page for every block.
+    The String/TextLine tags are in the page's ALTO namespace, falling back to
+    wildcard tags if the page's elements are not in a detected ALTO namespace.
+
+    Page files are read from the tar file sequentially (tarfile is not thread safe)
+    and each page is handed to one of the process's parser threads (see
+    get_page_executor) as soon as it has been read, so
+    decompressing the next page overlaps with parsing the previous ones (lxml
+    releases the GIL while parsing).
 
     Args:
         pages_tarinfo: List of TarInfo objects for page files
         tar: Open tarfile object
 
     Returns:
-        Dictionary mapping page IDs to tuples of (parsed XML root, namespace dict)
+        Dictionary mapping page IDs to tuples of (parsed XML root, namespace dict,
+        block ID to element dict, dict of String/TextLine tags)
     """
-    page_info = {}
+    if not pages_tarinfo:
+        return {}
 
+    executor = get_page_executor()
+    futures = []
     for i, page in enumerate(pages_tarinfo):
         with tar.extractfile(page) as f:
-            text = f.read()
-        parser = ET.XMLParser(remove_blank_text=True, recover=True)
-        try:
-            root = ET.fromstring(text, parser)
+            futures.append(executor.submit(parse_page, (i, f.read(), page.name)))
+    results = [future.result() for future in futures]
 
-            # Get the original namespace map from the root
-            original_nsmap = root.nsmap.copy()
+    return dict(result for result in results if result is not None)
 
-            # Create a clean namespace map for XPath (with no empty prefixes)
-            xpath_nsmap = {}
-
-            # Handle default namespace (xmlns without prefix)
-            if None in original_nsmap:
-                alto_ns = original_nsmap[None]
-                # Add with 'alto' prefix for XPath queries
-                xpath_nsmap["alto"] = alto_ns
-                # Only log this at debug level
-                if logging.getLogger().isEnabledFor(logging.DEBUG):
-                    logging.debug(f"Found default ALTO namespace in {page.name}: {alto_ns}")
-            else:
-                # Look for any namespace with 'alto' in the URL
-                alto_found = False
-                for prefix, uri in original_nsmap.items():
-                    if "alto" in uri.lower():
-                        xpath_nsmap["alto"] = uri
-                        alto_found = True
-                        # Only log this at debug level
-                        if logging.getLogger().isEnabledFor(logging.DEBUG):
-                            logging.debug(f"Found ALTO namespace with prefix {prefix} in {page.name}: {uri}")
-                        break
-
-                    # Copy other namespaces as-is
-                    xpath_nsmap[prefix] = uri
-
-                # If no ALTO namespace found, create a dummy one to avoid XPath errors
-                if not alto_found:
-                    # Use debug level instead of warning as this is common and expected
-                    logging.debug(f"No ALTO namespace found in {page.name}, using fallback")
-                    xpath_nsmap["alto"] = "http://www.loc.gov/standards/alto/ns-generic"
-
-            # For any other namespaces with real prefixes, copy them
-            for prefix, uri in original_nsmap.items():
-                if prefix is not None:
-                    xpath_nsmap[prefix] = uri
-
-            page_info[f"P{i+1}"] = (root, xpath_nsmap)
-        except ET.XMLSyntaxError as e:
-            logging.error(f"XML parsing error for page {i+1}: {str(e)}")
-            continue
+# %%
+def _is_hyphen_run(content):
+    """Return True if content consists only of two or more hyphens."""
+    return len(content) > 1 and content == "-" * len(content)
 
-    return page_info
+def _is_num_token(content):
+    """Return True if content is a number, optionally followed by an apostrophe."""
+    if content.endswith("'"):
+        content = content[:-1]
+    return content.isdecimal()
 
 # %%
 def process_text_block(block_strings):
@@ -324,89 +738,116 @@ def process_text_block(block_strings):
     # Handle empty blocks
     if not block_strings:
         return "", []
+
+    # Read the attributes used below once per string
+    contents = [s.get("CONTENT", "") for s in block_strings]
+    subs_types = [s.get("SUBS_TYPE", "") for s in block_strings]
+    wcs = [s.get("WC", "0") for s in block_strings] # word confidence
+    try:
+        confidences = [float(wc) for wc in wcs]
+    except ValueError:
+        confidences = []
+        for wc in wcs:
+            try:
+                confidences.append(float(wc))
+            except ValueError:
+                confidences.append(0.0)
+
     words = []
     word_confidences = []
-    skip_next = False
+    n = len(contents)
     i = 0
-    while i < len(block_strings):
-        if skip_next:
-            skip_next = False
-            i += 1
-            continue
-        s = block_strings[i]
-        content = s.get("CONTENT", "")
-        subs_type = s.get("SUBS_TYPE", "")
-        subs_content = s.get("SUBS_CONTENT", "")
-        wc = s.get("WC", "0") # word confidence
-        try:
-            word_confidence = float(wc)
-        except (ValueError, TypeError):
-            word_confidence = 0.0
+    while i < n:
+        content = contents[i]
 
         # Case 1: Check if this is a string with multiple consecutive hyphens that should be preserved
-        if content and re.match(r'^-{2,}$', content):
+        if _is_hyphen_run(content):
             # This is for consecutive hyphens - preserve it exactly
             words.append(content)
-            word_confidences.append(word_confidence)
+            word_confidences.append(confidences[i])
             i += 1
             continue
-        # Case 2: Handle numeric data followed by hyphens in tabular contexts
-        if re.match(r'^\d+\'?$', content) and subs_type == "HypPart1" and i + 1 < len(block_strings):
-            next_s = block_strings[i + 1]
-            next_content = next_s.get("CONTENT", "")
-            next_subs_type = next_s.get("SUBS_TYPE", "")
-            # If the next content is just hyphens or starts with hyphens, this is likely tabular data
-            if (next_content and (re.match(r'^-+', next_content) or next_subs_type == "HypPart2"
-                    and re.match(r'^-+', next_content))):
+        if subs_types[i] == "HypPart1" and i + 1 < n:
+            next_content = contents[i + 1]
+            # Case 2: Handle numeric data followed by hyphens in tabular contexts
+            # If the next content starts with hyphens, this is likely tabular data
+            if next_content.startswith("-") and _is_num_token(content):
                 # Preserve the number and add a hyphen
                 words.append(content + "-")
-                word_confidences.append(word_confidence)
+                word_confidences.append(confidences[i])
                 i += 1
                 continue
-        # Case 3: Handle genuine hyphenated words (like "com-puter" split across lines)
-        if subs_type == "HypPart1" and i + 1 < len(block_strings):
-            next_s = block_strings[i + 1]
-            next_subs_type = next_s.get("SUBS_TYPE", "")
-            next_content = next_s.get("CONTENT", "")
-            if next_subs_type == "HypPart2":
+            # Case 3: Handle genuine hyphenated words (like "com-puter" split across lines)
+            if subs_types[i + 1] == "HypPart2":
+                subs_content = block_strings[i].get("SUBS_CONTENT", "")
                 # Genuine hyphenated words typically don't have multiple hyphens in SUBS_CONTENT
-                if (subs_content and
-                    not re.search(r'-{2,}', subs_content) and
-                    not (next_content and re.match(r'^-{2,}$', next_content))):
-                    # Use SUBS_CONTENT
+                if subs_content and "--" not in subs_content and not _is_hyphen_run(next_content):
+                    # Use SUBS_CONTENT and skip the second part
                     words.append(subs_content)
-                    word_confidences.append(word_confidence)
-                    skip_next = True
-                    i += 1
-                    continue
-                else:
-                    # Just add the current content and let the next loop handle the next part
-                    words.append(content)
-                    word_confidences.append(word_confidence)
-                    i += 1
+                    word_confidences.append(confidences[i])
+                    i += 2
                     continue
+                # Otherwise just add the current content and let the next loop handle the next part
         # Case 4: Normal content - use as-is
         words.append(content)
-        word_confidences.append(word_confidence)
+        word_confidences.append(confidences[i])
         i += 1
     # Join with spaces
     total_string = " ".join(words)
     return total_string, word_confidences
 
 # %%
-def process_block(block_id, page_info, block_type = "content"):
+def parse_line_layout(block_lines, block_id):
+    """
+    Convert the HPOS, VPOS, WIDTH and HEIGHT attributes of all lines in a block
+    to integers in a single numpy conversion. Float values are truncated as with
+    int(float(value)).
+
+    Args:
+        block_lines: List of XML TextLine elements
+        block_id: Block ID (used for logging)
+
+    Returns:
+        Array of shape (4, number of lines) holding the HPOS, VPOS, WIDTH and
+        HEIGHT values of each line, with all four set to 0 for lines with invalid values
+    """
+    raw_values = [(line.get("HPOS", "0"), line.get("VPOS", "0"),
+                   line.get("WIDTH", "0"), line.get("HEIGHT", "0")) for line in block_lines]
+    try:
+        values = np.array(raw_values, dtype = float).reshape(-1, 4)
+    except ValueError:
+        values = None
+
+    if values is None or not np.isfinite(values).all():
+        # Fallback in case of invalid values - convert line by line
+        values = np.zeros((len(raw_values), 4))
+        for j, line_values in enumerate(raw_values):
+            try:
+                parsed = [float(value) for value in line_values]
+            except ValueError:
+                parsed = None
+            if parsed is None or not np.isfinite(parsed).all():
+                logging.warning("Invalid dimension value for line in block %s", block_id)
+                continue
+            values[j] = parsed
+
+    # Transpose so each attribute is a contiguous row
+    return np.ascontiguousarray(values.astype(np.intc).T)
+
+# %%
+def process_block(block_id, page_info, block_type = "content", _page_re = _PAGE_RE, _block_kind = _BLOCK_KIND):
     """
     Process a single block regardless of namespace.
 
     Args:
         block_id: Block ID
-        page_info: Dictionary of parsed ALTO XML roots and their namespaces
+        page_info: Dictionary of parsed ALTO XML roots, their namespaces, block indexes and element tags
         block_type: Type of block ("title" or "content")
 
     Returns:
         Dictionary of extracted block data
     """
-    match = re.match(r"P(\d+)_", block_id)
+    match = _page_re.match(block_id)
     if not match:
         return None
 
@@ -414,20 +855,21 @@ def process_block(block_id, page_info, block_type = "content"):
     if page_no not in page_info:
         return None
 
-    page_root = page_info[page_no][0]
-
-    alto_block_type = "TextBlock" if "TB" in block_id else "ComposedBlock" if "CB" in block_id else None
+    # The block type code directly follows the page prefix, e.g. P1_TB00001
+    kind_start = match.end()
+    alto_block_type = _block_kind.get(block_id[kind_start:kind_start + 2])
     if not alto_block_type:
         return None
 
-    # Using local-name approach
-    xml_blocks = page_root.xpath(f".//*[local-name()='{alto_block_type}' and @ID='{block_id}']")
-    if not xml_blocks:
+    _, _, id_index, page_tags = page_info[page_no]
+
+    # Look up the block in the page's ID index
+    xml_block = id_index.get(block_id)
+    if xml_block is None or ET.QName(xml_block).localname != alto_block_type:
         return None
-    xml_block = xml_blocks[0]
 
-    block_strings = xml_block.xpath(".//*[local-name()='String']")
-    block_lines = xml_block.xpath(".//*[local-name()='TextLine']")
+    block_strings = list(xml_block.iter(page_tags["string"]))
+    block_lines = list(xml_block.iter(page_tags["line"]))
 
     if block_type == "title":
         text_key = "title_block"
@@ -443,14 +885,6 @@ def process_block(block_id, page_info, block_type = "content"):
     result = {
         text_key: [],
         confidence_key: [],
-        f"{prefix}line_widths": [],
-        f"{prefix}line_heights": [],
-        f"{prefix}line_hpos": [],
-        f"{prefix}line_vpos": [],
-        f"{prefix}block_hpos": [],
-        f"{prefix}block_vpos": [],
-        f"{prefix}block_widths": [],
-        f"{prefix}block_heights": [],
         block_id_key: [block_id],
     }
 
@@ -467,29 +901,23 @@ def process_block(block_id, page_info, block_type = "content"):
         block_height = int(float(xml_block.get("HEIGHT", "0")))
     except ValueError:
         # Fallback in case of invalid values
-        logging.warning(f"Invalid dimension value for block {block_id}")
+        logging.warning("Invalid dimension value for block %s", block_id)
         block_hpos = block_vpos = block_width = block_height = 0
 
-    result[f"{prefix}block_hpos"].append(block_hpos)
-    result[f"{prefix}block_vpos"].append(block_vpos)
-    result[f"{prefix}block_widths"].append(block_width)
-    result[f"{prefix}block_heights"].append(block_height)
+    result[f"{prefix}block_hpos"] = array("i", [block_hpos])
+    result[f"{prefix}block_vpos"] = array("i", [block_vpos])
+    result[f"{prefix}block_widths"] = array("i", [block_width])
+    result[f"{prefix}block_heights"] = array("i", [block_height])
 
-    for line in block_lines:
-        try:
-            line_hpos = int(float(line.get("HPOS", "0")))
-            line_vpos = int(float(line.get("VPOS", "0")))
-            line_width = int(float(line.get("WIDTH", "0")))
-            line_height = int(float(line.get("HEIGHT", "0")))
-        except ValueError:
-            # Fallback in case of invalid values
-            logging.warning(f"Invalid dimension value for line in block {block_id}")
-            line_hpos = line_vpos = line_width = line_height = 0
-
-        result[f"{prefix}line_hpos"].append(line_hpos)
-        result[f"{prefix}line_vpos"].append(line_vpos)
-        result[f"{prefix}line_widths"].append(line_width)
-        result[f"{prefix}line_heights"].append(line_height)
+    # Convert the layout values of all lines at once, one int array per attribute
+    line_hpos, line_vpos, line_widths, line_heights = (
+        array("i", column.tobytes()) for column in parse_line_layout(block_lines, block_id)
+    )
+
+    result[f"{prefix}line_hpos"] = line_hpos
+    result[f"{prefix}line_vpos"] = line_vpos
+    result[f"{prefix}line_widths"] = line_widths
+    result[f"{prefix}line_heights"] = line_heights
 
     return result
 
@@ -525,7 +953,7 @@ def extract_text_from_alto(article_codes, page_info, issue_code):
 
         # Log articles that don't have any blocks
         if len(title_block_ids) == 0 and len(text_block_ids) == 0:
-            logging.warning(f"Skipping article '{article_id}' with title '{mets_title}' - No text or title blocks found")
+            logging.warning("Skipping article '%s' with title '%s' - No text or title blocks found", article_id, mets_title)
             skipped_articles += 1
             continue
 
@@ -557,14 +985,14 @@ def process_title_blocks(title_block_ids, page_info, issue_code):
     title_data = {
         "title_block": [],
         "title_confidences": [],
-        "title_line_widths": [],
-        "title_line_heights": [],
-        "title_line_hpos": [],
-        "title_line_vpos": [],
-        "title_block_hpos": [],
-        "title_block_vpos": [],
-        "title_block_widths": [],
-        "title_block_heights": [],
+        "title_line_widths": array("i"),
+        "title_line_heights": array("i"),
+        "title_line_hpos": array("i"),
+        "title_line_vpos": array("i"),
+        "title_block_hpos": array("i"),
+        "title_block_vpos": array("i"),
+        "title_block_widths": array("i"),
+        "title_block_heights": array("i"),
         "processed_title_block_ids": [],
     }
 
@@ -572,7 +1000,7 @@ def process_title_blocks(title_block_ids, page_info, issue_code):
         block_data = process_block(block_id, page_info, block_type = "title")
         if block_data:
             for key, value in block_data.items():
-                if isinstance(value, list):
+                if isinstance(value, (list, array)):
                     title_data[key].extend(value)
                 else:
                     title_data[key] = value
@@ -595,33 +1023,36 @@ def process_content_blocks(text_block_ids, page_info, issue_code, order_map = No
     Returns:
         Dictionary containing processed content data
     """
-    # Initialise arrays for content data
+    # Initialise arrays for content data, with layout values in typed int arrays
     content_data = {
         "text_blocks": [],
         "word_confidences": [],
-        "line_widths": [],
-        "line_heights": [],
-        "line_hpos": [],
-        "line_vpos": [],
-        "block_hpos": [],
-        "block_vpos": [],
-        "block_widths": [],
-        "block_heights": [],
+        "line_widths": array("i"),
+        "line_heights": array("i"),
+        "line_hpos": array("i"),
+        "line_vpos": array("i"),
+        "block_hpos": array("i"),
+        "block_vpos": array("i"),
+        "block_widths": array("i"),
+        "block_heights": array("i"),
         "processed_text_block_ids": [],
         "block_order_positions": [],  # Store position for each block
     }
 
     blocks_data = []  # Will store (block_id, block_data, order_position)
+    get_position = order_map.get if order_map else None
 
     for block_id in text_block_ids:
         block_data = process_block(block_id, page_info, block_type="content")
         if block_data:
             # Get position from order_map or assign a high value
-            position = order_map.get(block_id, 999) if order_map else 999
+            position = get_position(block_id, 999) if get_position else 999
             blocks_data.append((block_id, block_data, position))
 
-    # Sort blocks by position
-    blocks_data.sort(key=lambda x: x[2])
+    # Sort blocks by position. text_block_ids from mets2codes_inner are already
+    # in order_map order, so the sort is only needed if positions are out of order.
+    if any(blocks_data[k][2] > blocks_data[k + 1][2] for k in range(len(blocks_data) - 1)):
+        blocks_data.sort(key=lambda x: x[2])
 
     # Process blocks in correct order
     for block_id, block_data, position in blocks_data:
@@ -629,14 +1060,14 @@ def process_content_blocks(text_block_ids, page_info, issue_code, order_map = No
         content_data["word_confidences"].extend(block_data.get("word_confidences", []))
         content_data["processed_text_block_ids"].extend(block_data.get("processed_text_block_ids", []))
         content_data["block_order_positions"].extend([position] * len(block_data.get("text_blocks", [])))
-        content_data["line_widths"].extend(block_data.get("line_widths", []))
-        content_data["line_heights"].extend(block_data.get("line_heights", []))
-        content_data["line_hpos"].extend(block_data.get("line_hpos", []))
-        content_data["line_vpos"].extend(block_data.get("line_vpos", []))
-        content_data["block_hpos"].extend(block_data.get("block_hpos", []))
-        content_data["block_vpos"].extend(block_data.get("block_vpos", []))
-        content_data["block_widths"].extend(block_data.get("block_widths", []))
-        content_data["block_heights"].extend(block_data.get("block_heights", []))
+        content_data["line_widths"].extend(block_data["line_widths"])
+        content_data["line_heights"].extend(block_data["line_heights"])
+        content_data["line_hpos"].extend(block_data["line_hpos"])
+        content_data["line_vpos"].extend(block_data["line_vpos"])
+        content_data["block_hpos"].extend(block_data["block_hpos"])
+        content_data["block_vpos"].extend(block_data["block_vpos"])
+        content_data["block_widths"].extend(block_data["block_widths"])
+        content_data["block_heights"].extend(block_data["block_heights"])
 
     return content_data
 
@@ -659,29 +1090,30 @@ def combine_article_data(mets_title, title_data, content_data, non_text_elements
     title_text = clean_text(title_text)
     full_text = clean_text(full_text)
 
+    # Layout values and confidences are stored as int32 and float32 arrays
     return (
         mets_title, # Original METS title
         title_text, # Title text from ALTO (just in case it's different)
         full_text,
-        title_data["title_line_widths"],
-        title_data["title_line_heights"],
-        title_data["title_line_hpos"],
-        title_data["title_line_vpos"],
-        title_data["title_block_hpos"],
-        title_data["title_block_vpos"],
-        title_data["title_block_widths"],
-        title_data["title_block_heights"],
-        title_data["title_confidences"],
+        np.asarray(title_data["title_line_widths"], dtype = np.int32),
+        np.asarray(title_data["title_line_heights"], dtype = np.int32),
+        np.asarray(title_data["title_line_hpos"], dtype = np.int32),
+        np.asarray(title_data["title_line_vpos"], dtype = np.int32),
+        np.asarray(title_data["title_block_hpos"], dtype = np.int32),
+        np.asarray(title_data["title_block_vpos"], dtype = np.int32),
+        np.asarray(title_data["title_block_widths"], dtype = np.int32),
+        np.asarray(title_data["title_block_heights"], dtype = np.int32),
+        np.asarray(title_data["title_confidences"], dtype = np.float32),
         title_data["processed_title_block_ids"],
-        content_data["line_widths"],
-        content_data["line_heights"],
-        content_data["line_hpos"],
-        content_data["line_vpos"],
-        content_data["block_hpos"],
-        content_data["block_vpos"],
-        content_data["block_widths"],
-        content_data["block_heights"],
-        content_data["word_confidences"],
+        np.asarray(content_data["line_widths"], dtype = np.int32),
+        np.asarray(content_data["line_heights"], dtype = np.int32),
+        np.asarray(content_data["line_hpos"], dtype = np.int32),
+        np.asarray(content_data["line_vpos"], dtype = np.int32),
+        np.asarray(content_data["block_hpos"], dtype = np.int32),
+        np.asarray(content_data["block_vpos"], dtype = np.int32),
+        np.asarray(content_data["block_widths"], dtype = np.int32),
+        np.asarray(content_data["block_heights"], dtype = np.int32),
+        np.asarray(content_data["word_confidences"], dtype = np.float32),
         content_data["processed_text_block_ids"],
         non_text_elements,
     )
@@ -698,24 +1130,258 @@ def get_mets_and_alto_files(tar, dir_prefix):
     Returns:
         Tuple of (mets_file, page_files)
     """
-    all_members = tar.getmembers()
     mets_file = None
     page_files = []
-
-    for member in all_members:
-        if member.name.startswith(dir_prefix) and member.name.endswith(".xml"):
-            if "mets.xml" in member.name:
-                mets_file = member
-            elif re.search(r"/\d+\.xml$", member.name):
-                page_files.append(member)
+    in_prefix = False
+
+    # Stream the members instead of loading the whole tar index. An issue's
+    # files are stored together, so stop once we have left its directory
+    for member in tar:
+        name = member.name
+        if not name.startswith(dir_prefix):
+            if in_prefix and mets_file is not None:
+                break
+            continue
+        in_prefix = True
+        if not member.isfile() or not name.endswith(".xml"):
+            continue
+        if "mets.xml" in name:
+            mets_file = member
+        else:
+            match = _PAGE_NUM_RE.search(name)
+            if match:
+                page_files.append((int(match.group(1)), member))
 
     # Sort page files by number
-    page_files.sort(key = lambda x: int(re.search(r"/(\d+)\.xml$", x.name).group(1)))
+    page_files.sort(key = lambda x: x[0])
+    page_files = [member for _, member in page_files]
 
     return mets_file, page_files
 
 # %%
-def process_issue(args, input_paths, output_path, rev_date):
+def layout_struct_array(layout_columns):
+    """
+    Combine the four layout columns of a group of lines or blocks into one
+    Arrow list<struct<hpos, vpos, width, height>> array.
+
+    Args:
+        layout_columns: List of the HPOS, VPOS, width and height columns, each a
+        sequence of int32 arrays (one per article) of equal length per article
+
+    Returns:
+        pyarrow ListArray with one list of structs per article
+    """
+    first_column = layout_columns[0]
+    offsets = np.zeros(len(first_column) + 1, dtype = np.int32)
+    np.cumsum([len(values) for values in first_column], out = offsets[1:])
+    fields = [
+        pa.array(np.concatenate(column) if len(column) else np.empty(0, dtype = np.int32), type = pa.int32())
+        for column in layout_columns
+    ]
+    structs = pa.StructArray.from_arrays(fields, names = LAYOUT_STRUCT_FIELDS)
+    return pa.ListArray.from_arrays(pa.array(offsets), structs)
+
+def write_issue_parquet(articles_with_text, output_file_path, struct_layout = False):
+    """
+    Write the extracted articles of an issue to a parquet file with one row per article.
+    With pyarrow a record batch is built directly from the article columns using the
+    fixed output schema and written as a single zstd compressed row group, without
+    going through a table. Otherwise pandas is used with the available parquet engine.
+
+    Args:
+        articles_with_text: Dictionary mapping article IDs to tuples of column values
+        output_file_path: Path of the parquet file to write
+        struct_layout: Store the layout values of lines and blocks as lists of
+        structs (STRUCT_ISSUE_ARROW_SCHEMA) instead of separate columns (pyarrow only)
+    """
+    if parquet_engine == "pyarrow":
+        # Transpose the article tuples into columns
+        if articles_with_text:
+            column_values = list(zip(*articles_with_text.values()))
+        else:
+            column_values = [() for _ in ISSUE_COLUMNS]
+        columns = dict(zip(ISSUE_COLUMNS, column_values))
+        columns[INDEX_COLUMN] = list(articles_with_text)
+
+        if struct_layout:
+            for group, group_columns in LAYOUT_STRUCT_GROUPS.items():
+                columns[group] = layout_struct_array([columns.pop(name) for name in group_columns])
+            schema = STRUCT_ISSUE_ARROW_SCHEMA
+        else:
+            schema = ISSUE_ARROW_SCHEMA
+        batch = pa.RecordBatch.from_pydict(columns, schema = schema)
+        # One row group per issue, and no column statistics as the files are
+        # never filtered on read
+        with pq.ParquetWriter(output_file_path, schema, compression = "zstd",
+                              compression_level = 3, use_dictionary = True,
+                              write_statistics = False) as writer:
+            writer.write_batch(batch, row_group_size = max(1, batch.num_rows))
+    else:
+        # Build the dataframe column by column, converting the numeric arrays back
+        # to lists for the pandas object columns
+        if articles_with_text:
+            columns = {
+                name: [value.tolist() if isinstance(value, np.ndarray) else value for value in values]
+                for name, values in zip(ISSUE_COLUMNS, zip(*articles_with_text.values()))
+            }
+            df = pd.DataFrame(columns, index = list(articles_with_text), columns = ISSUE_COLUMNS)
+        else:
+            df = pd.DataFrame(columns = ISSUE_COLUMNS)
+        df.to_parquet(output_file_path, engine = parquet_engine)
+
+# %%
+# Tar files kept open per process, so consecutive issues from the same archive
+# reuse its already read member index instead of opening it again.
+# Maps tar paths to tuples of (tarfile object, indexed_gzip file or None)
+MAX_OPEN_TARS = 2
+_OPEN_TARS = {}
+
+def open_tar(tar_path):
+    """
+    Return an open tarfile object for the given path, reusing a cached one if
+    possible. The least recently used tar file is closed once more than
+    MAX_OPEN_TARS are open. New tar files are read through indexed_gzip
+    if it is installed.
+
+    Args:
+        tar_path: Full path to the tar.gz file
+
+    Returns:
+        Open tarfile object
+    """
+    entry = _OPEN_TARS.pop(tar_path, None)
+    if entry is None:
+        while len(_OPEN_TARS) >= MAX_OPEN_TARS:
+            close_tar(next(iter(_OPEN_TARS)))
+        if indexed_gzip_available:
+            gz_file = None
+            try:
+                gz_file = indexed_gzip.IndexedGzipFile(tar_path)
+                entry = (tarfile.open(fileobj = gz_file, mode = "r:"), gz_file)
+            except Exception as e:
+                # Fall back to tarfile's own gzip support
+                logging.warning("Could not open %s with indexed_gzip: %s", tar_path, e)
+                if gz_file is not None:
+                    gz_file.close()
+        if entry is None:
+            entry = (tarfile.open(tar_path), None)
+    # Most recently used tar files are kept at the end
+    _OPEN_TARS[tar_path] = entry
+    return entry[0]
+
+def close_tar(tar_path):
+    """Close and forget the cached tarfile object for the given path, if any."""
+    entry = _OPEN_TARS.pop(tar_path, None)
+    if entry is not None:
+        tar, gz_file = entry
+        tar.close()
+        # tarfile does not close a file object it was given
+        if gz_file is not None:
+            gz_file.close()
+
+def close_open_tars():
+    """Close all cached tarfile objects."""
+    for tar_path in list(_OPEN_TARS):
+        close_tar(tar_path)
+
+atexit.register(close_open_tars)
+
+# %%
+# Background parquet writer of a worker process, started by init_worker. Issues are
+# queued for writing so the worker can go on with parsing the next issue while the
+# previous one is compressed and written. The queue is kept short to bound memory
+_WRITE_QUEUE = None
+# Issue codes whose parquet file could not be written, mapped to the error message
+_WRITE_FAILURES = {}
+
+def write_issue_and_log(issue_code, articles_with_text, output_file_path, struct_layout, start_time):
+    """Write an issue to its parquet file and log the time taken since start_time."""
+    write_issue_parquet(articles_with_text, output_file_path, struct_layout)
+    elapsed = time.time() - start_time
+    logging.info(f"Processed {issue_code} with {len(articles_with_text)} articles in {elapsed:.2f} seconds")
+
+def _issue_writer_loop(write_queue):
+    """Write the queued issues to parquet files until the process exits."""
+    while True:
+        issue_code, articles_with_text, output_file_path, struct_layout, start_time = write_queue.get()
+        try:
+            write_issue_and_log(issue_code, articles_with_text, output_file_path, struct_layout, start_time)
+        except Exception as e:
+            logging.error(f"Error writing parquet file for {issue_code}: {str(e)}")
+            _WRITE_FAILURES[issue_code] = str(e)
+        finally:
+            write_queue.task_done()
+
+def start_issue_writer():
+    """Start the background parquet writer thread of this process."""
+    global _WRITE_QUEUE
+    _WRITE_QUEUE = queue.Queue(maxsize = 2)
+    _WRITE_FAILURES.clear()
+    threading.Thread(target = _issue_writer_loop, args = (_WRITE_QUEUE,), daemon = True).start()
+
+def write_issue(issue_code, articles_with_text, output_file_path, struct_layout = False, start_time = None):
+    """
+    Queue an issue for the background writer if one is running, otherwise
+    write it straight away.
+
+    Args:
+        issue_code: Issue code identifier
+        articles_with_text: Dictionary mapping article IDs to tuples of column values
+        output_file_path: Path of the parquet file to write
+        struct_layout: Write the layout values as lists of structs (see write_issue_parquet)
+        start_time: Time processing of the issue started, for the log message once written
+    """
+    if start_time is None:
+        start_time = time.time()
+    job = (issue_code, articles_with_text, output_file_path, struct_layout, start_time)
+    if _WRITE_QUEUE is not None:
+        _WRITE_QUEUE.put(job)
+    else:
+        write_issue_and_log(*job)
+
+def wait_for_issue_writes():
+    """
+    Wait until all queued issues have been written.
+
+    Returns:
+        Dictionary mapping the issue codes that could not be written to the error message
+    """
+    if _WRITE_QUEUE is not None:
+        _WRITE_QUEUE.join()
+    failures = dict(_WRITE_FAILURES)
+    _WRITE_FAILURES.clear()
+    return failures
+
+# %%
+def issue_output_file_path(issue_code, output_path, rev_date, partitioned = False):
+    """
+    Return the path of an issue's parquet file. By default all issue files are
+    written to pp_issue_mets_alto_dfs. If partitioned, they are written to a
+    Hive style dataset in pp_issue_mets_alto_ds with one directory per newspaper
+    and year (newspaper=CHP/year=1903/...), so readers of the dataset can skip
+    whole newspapers and years. The directories are created as needed.
+
+    Args:
+        issue_code: Issue code (e.g., "CHP_19031228")
+        output_path: Path to the output directory
+        rev_date: Revision date for output files
+        partitioned: Use the partitioned dataset layout
+
+    Returns:
+        Path of the parquet file
+    """
+    file_name = f"PP_{issue_code}_{rev_date}.parquet"
+    if not partitioned:
+        return os.path.join(output_path, "pp_issue_mets_alto_dfs", file_name)
+
+    newspaper, date_str = issue_code.split("_", 1)
+    partition_dir = os.path.join(output_path, "pp_issue_mets_alto_ds",
+                                 f"newspaper={newspaper}", f"year={date_str[:4]}")
+    os.makedirs(partition_dir, exist_ok = True)
+    return os.path.join(partition_dir, file_name)
+
+# %%
+def process_issue(args, input_paths, output_path, rev_date, struct_layout = False, partitioned = False):
     """
     Process by single issue - extracting article info from METS and text from ALTO files.
 
@@ -724,6 +1390,9 @@ def process_issue(args, input_paths, output_path, rev_date):
         input_paths: List of paths to the input directories
         output_path: Path to the output directory
         rev_date: Revision date for output files
+        struct_layout: Write the layout values as lists of structs (see write_issue_parquet)
+        partitioned: Write the issue file into the newspaper/year partitioned dataset
+        (see issue_output_file_path)
 
     Returns:
         Tuple of (issue_code, success_flag, number_of_articles, number_of_pages, number_of_skipped_articles)
@@ -747,103 +1416,168 @@ def process_issue(args, input_paths, output_path, rev_date):
             logging.error(f"Tar file {tar_path} not found in any input paths")
             return issue_code, False, 0, 0, 0
 
-        with tarfile.open(tar_full_path) as tar:
-            try:
-                mets_file, page_files = get_mets_and_alto_files(tar, dir_prefix)
-                if mets_file is None:
-                    logging.error(f"METS file not found for {issue_code}")
-                    return issue_code, False, 0, 0, 0
-                if len(page_files) == 0:
-                    logging.error(f"ALTO files not found for {issue_code}")
-                    return issue_code, False, 0, 0, 0
+        tar = open_tar(tar_full_path)
+        try:
+            mets_file, page_files = get_mets_and_alto_files(tar, dir_prefix)
+            if mets_file is None:
+                logging.error(f"METS file not found for {issue_code}")
+                return issue_code, False, 0, 0, 0
+            if len(page_files) == 0:
+                logging.error(f"ALTO files not found for {issue_code}")
+                return issue_code, False, 0, 0, 0
 
-                mets_text = tar.extractfile(mets_file).read()
-                article_codes = mets2codes_inner(mets_text, issue_code)
+            mets_text = tar.extractfile(mets_file).read()
+            article_codes = mets2codes_inner(mets_text, issue_code)
 
-                if len(article_codes) == 0:
-                    logging.warning(f"No articles found in METS file for {issue_code}")
-                    return issue_code, False, 0, 0, 0
+            if len(article_codes) == 0:
+                logging.warning(f"No articles found in METS file for {issue_code}")
+                return issue_code, False, 0, 0, 0
 
-                total_articles_in_mets = len(article_codes)
-                logging.info(f"Found {total_articles_in_mets} articles in METS file for {issue_code}")
+            total_articles_in_mets = len(article_codes)
+            logging.info(f"Found {total_articles_in_mets} articles in METS file for {issue_code}")
 
+            if _DEBUG:
                 for article_id, article_data in article_codes.items():
                     mets_title = article_data[0]  # First element is the title
-                    logging.debug(f"Article in METS: {article_id}, Title: '{mets_title}'")
-
-                page_info = parse_pages(page_files, tar)
-
-                if len(page_info) == 0:
-                    logging.error(f"Failed to parse ALTO files for {issue_code}")
-                    return issue_code, False, 0, 0, 0
-
-                articles_with_text = extract_text_from_alto(article_codes, page_info, issue_code)
-                skipped_articles = total_articles_in_mets - len(articles_with_text)
-
-                if skipped_articles > 0:
-                    logging.warning(f"Issue {issue_code}: {skipped_articles} out of {total_articles_in_mets} articles were skipped")
-
-                df = pd.DataFrame.from_dict(
-                    articles_with_text,
-                    orient = "index",
-                    columns = [
-                        "mets_title",           # Original METS title
-                        "title_text",           # Title text from ALTO
-                        "text",                 # Content text from ALTO
-                        "title_line_widths",    # Width of each line in title
-                        "title_line_heights",   # Height of each line in title
-                        "title_line_hpos",      # HPOS of each line in title
-                        "title_line_vpos",      # VPOS of each line in title
-                        "title_block_hpos",     # HPOS of each block in title
-                        "title_block_vpos",     # VPOS of each block in title
-                        "title_block_widths",   # Width of each block in title
-                        "title_block_heights",  # Height of each block in title
-                        "title_confidences",    # Word confidences in title
-                        "title_block_ids",      # Block IDs for title
-                        "line_widths",          # Width of each line in content
-                        "line_heights",         # Height of each line in content
-                        "line_hpos",            # HPOS of each line in content
-                        "line_vpos",            # VPOS of each line in content
-                        "block_hpos",           # HPOS of each block in content
-                        "block_vpos",           # VPOS of each block in content
-                        "block_widths",         # Width of each block in content
-                        "block_heights",        # Height of each block in content
-                        "word_confidences",     # Word confidences in content
-                        "block_ids",            # Block IDs for content
-                        "non_text_elements",    # List of each non-text element found (including duplicates)
-                    ]
-                )
-
-                output_file_path = os.path.join(
-                    output_path,
-                    "pp_issue_mets_alto_dfs",
-                    f"PP_{issue_code}_{rev_date}.parquet"
-                )
-
-                df.to_parquet(output_file_path, engine = parquet_engine)
-
-                # Clear memory
-                for root, _ in page_info.values():
-                    root.clear()
-
-                elapsed = time.time() - start_time
-                logging.info(f"Processed {issue_code} with {len(df)} articles in {elapsed:.2f} seconds")
-
-                return issue_code, True, len(df), len(page_files), skipped_articles
+                    logging.debug("Article in METS: %s, Title: '%s'", article_id, mets_title)
 
-            except Exception as e:
-                logging.error(f"Error processing tar content for {issue_code}: {str(e)}")
+            page_info = parse_pages(page_files, tar)
+
+            if len(page_info) == 0:
+                logging.error(f"Failed to parse ALTO files for {issue_code}")
                 return issue_code, False, 0, 0, 0
 
+            articles_with_text = extract_text_from_alto(article_codes, page_info, issue_code)
+            skipped_articles = total_articles_in_mets - len(articles_with_text)
+
+            if skipped_articles > 0:
+                logging.warning(f"Issue {issue_code}: {skipped_articles} out of {total_articles_in_mets} articles were skipped")
+
+            output_file_path = issue_output_file_path(issue_code, output_path, rev_date, partitioned)
+
+            write_issue(issue_code, articles_with_text, output_file_path, struct_layout, start_time)
+            extracted_articles = len(articles_with_text)
+
+            # Free memory - dropping the references releases the parsed pages
+            # without walking them again with root.clear()
+            del page_info, article_codes, articles_with_text
+
+            return issue_code, True, extracted_articles, len(page_files), skipped_articles
+
+        except Exception as e:
+            logging.error(f"Error processing tar content for {issue_code}: {str(e)}")
+            # Don't reuse a tar file handle that may be in a broken state
+            close_tar(tar_full_path)
+            return issue_code, False, 0, 0, 0
+
     except Exception as e:
         logging.error(f"Error processing {issue_code}: {str(e)}")
 
         return issue_code, False, 0, 0, 0
 
 # %%
-def batch_process_issues(issues, max_workers, input_paths, output_path, rev_date):
+def process_issue_bin(issue_bin):
+    """
+    Process a bin of issues sequentially in one worker, using the input paths,
+    output path and revision date stored by init_worker.
+
+    Args:
+        issue_bin: List of (issue_code, mets_path) tuples
+
+    Returns:
+        List of process_issue results, one per issue
+    """
+    input_paths = _WORKER_CTX["input_paths"]
+    output_path = _WORKER_CTX["output_path"]
+    rev_date = _WORKER_CTX["rev_date"]
+    struct_layout = _WORKER_CTX["struct_layout"]
+    partitioned = _WORKER_CTX["partitioned"]
+    progress_queue = _WORKER_CTX.get("progress_queue")
+    results = []
+    for issue_item in issue_bin:
+        results.append(process_issue(issue_item, input_paths, output_path, rev_date, struct_layout, partitioned))
+        # Report each issue, so the progress bar does not wait for the whole bin
+        if progress_queue is not None:
+            progress_queue.put(1)
+
+    # Report issues whose parquet file could not be written as failed
+    write_failures = wait_for_issue_writes()
+    if write_failures:
+        results = [(result[0], False, 0, 0, 0) if result[0] in write_failures else result
+                   for result in results]
+    return results
+
+def make_issue_bins(issue_items, issue_sizes, n_bins, archive_order = False):
+    """
+    Split the issues of each tar file, in archive order, into contiguous runs
+    of at most about 1/n_bins of the total size, then greedily pack the runs into
+    bins of similar total size, placing each run (largest first) in the bin with
+    the smallest total so far. Each part of an archive is thus read by one worker
+    only, instead of every bin reading every archive.
+
+    Args:
+        issue_items: List of (issue_code, mets_path) tuples
+        issue_sizes: Dictionary mapping issue codes to their size in bytes
+        n_bins: Number of bins to fill
+        archive_order: issue_items are in the order of the METS files in their tar
+        files, as found by discover_and_process_issues. Tar files are not
+        necessarily stored in path order, so this order is kept. Otherwise the
+        issues are sorted by their path
+
+    Returns:
+        List of non-empty bins, largest total size first, with the issues in
+        each bin grouped by tar file
+    """
+    n_bins = max(1, n_bins)
+    target_size = sum(issue_sizes.get(issue_code, 0) for issue_code, _ in issue_items) / n_bins
+
+    if not archive_order:
+        issue_items = sorted(issue_items, key = lambda item: item[1])
+    item_order = {issue_code: i for i, (issue_code, _) in enumerate(issue_items)}
+
+    # Issues of each tar file in archive order
+    archive_items = {}
+    for item in issue_items:
+        archive_items.setdefault(item[1].split(".tar.gz")[0], []).append(item)
+
+    runs = []
+    for items in archive_items.values():
+        run, run_size = [], 0
+        for item in items:
+            size = issue_sizes.get(item[0], 0)
+            if run and run_size + size > target_size:
+                runs.append((run_size, run))
+                run, run_size = [], 0
+            run.append(item)
+            run_size += size
+        runs.append((run_size, run))
+
+    runs.sort(key = lambda run: run[0], reverse = True)
+    heap = [(0, b, []) for b in range(n_bins)]
+    for run_size, run in runs:
+        total, b, issue_bin = heapq.heappop(heap)
+        issue_bin.extend(run)
+        heapq.heappush(heap, (total + run_size, b, issue_bin))
+
+    # Keep the issues of each tar file together within a bin, in archive order
+    # so a reused tar file handle only has to read forwards
+    heap.sort(key = lambda entry: (-entry[0], entry[1]))
+    return [sorted(issue_bin, key = lambda item: item_order[item[0]]) for _, _, issue_bin in heap if issue_bin]
+
+def update_progress(progress_queue, progress):
+    """Advance the progress bar by the counts posted by the workers until None is received."""
+    for count in iter(progress_queue.get, None):
+        progress.update(count)
+
+# %%
+def batch_process_issues(issues, max_workers, input_paths, output_path, rev_date, issue_sizes = None,
+                         struct_layout = False, partitioned = False):
     """
     Process multiple issues in parallel.
+    The issues are packed into bins (BINS_PER_WORKER per worker) of contiguous runs
+    of issues from each archive, balanced by issue size if known and otherwise by the
+    number of issues. The largest bins are submitted first, so that a large issue is
+    not left running on its own at the end of the batch.
 
     Args:
         issues: Dictionary mapping issue codes to METS file paths
@@ -851,37 +1585,63 @@ def batch_process_issues(issues, max_workers, input_paths, output_path, rev_date
         input_paths: List of one or more paths to the input directories
         output_path: Path to the output directory
         rev_date: Revision date for output files
+        issue_sizes: Dictionary mapping issue codes to their size in bytes (optional)
+        struct_layout: Write the layout values as lists of structs (optional)
+        partitioned: Write a newspaper/year partitioned dataset (optional)
 
     Returns:
         Tuple of (successful_issues, failed_issues, statistics)
     """
     # Determine optimal worker count if not specified
     if max_workers is None:
-        max_workers = min(cpu_count() - 1, len(issues))  # Leave one core free for system processes
+        # Each worker also parses pages in up to MAX_PAGE_THREADS threads, so use half the cores
+        max_workers = max(1, min(cpu_count() // 2, len(issues)))
 
     print(f"Starting parallel processing with {max_workers} workers for {len(issues)} issues")
 
     issue_items = list(issues.items())
+    # Sizes are only known for discovered issues, which are in archive order
+    archive_order = bool(issue_sizes)
+    if not issue_sizes:
+        # Without sizes, bins of contiguous runs with similar numbers of issues, so a
+        # worker still processes several issues of an archive before waiting for its writes
+        issue_sizes = dict.fromkeys(issues, 1)
+    issue_bins = make_issue_bins(issue_items, issue_sizes, max_workers * BINS_PER_WORKER, archive_order)
 
-    process_issue_partial = partial(process_issue,
-                                    input_paths = input_paths,
-                                    output_path = output_path,
-                                    rev_date = rev_date)
     results = []
-
-    with Pool(processes=max_workers) as pool:
-        results = list(tqdm(
-            pool.imap(process_issue_partial, issue_items),
-            total = len(issue_items),
-            desc = "Processing issues"
-        ))
-
-    successful = [r[0] for r in results if r[1]]
-    failed = [r[0] for r in results if not r[1]]
-
-    stats = {r[0]: {"articles": r[2],
-                    "pages": r[3] if len(r) > 3 else 0,
-                    "skipped_articles": r[4] if len(r) > 4 else 0} for r in results if r[1]}
+    # Workers post each processed issue here. SimpleQueue writes to the pipe
+    # directly, so all updates of a bin arrive before the closing None below
+    progress_queue = SimpleQueue()
+
+    with Pool(processes=max_workers, initializer=init_worker,
+              initargs=(input_paths, output_path, rev_date, struct_layout, partitioned,
+                        progress_queue)) as pool:
+        with tqdm(total = len(issue_items), desc = "Processing issues") as progress:
+            progress_thread = threading.Thread(target = update_progress, args = (progress_queue, progress))
+            progress_thread.start()
+            try:
+                for bin_results in pool.imap_unordered(process_issue_bin, issue_bins):
+                    results.extend(bin_results)
+            finally:
+                progress_queue.put(None)
+                progress_thread.join()
+
+    # Results arrive in completion order, so report them in the original issue order
+    issue_order = {issue_code: i for i, issue_code in enumerate(issues)}
+    results.sort(key = lambda r: issue_order[r[0]])
+
+    # Every process_issue result is (issue_code, success, articles, pages, skipped_articles)
+    successful = []
+    failed = []
+    stats = {}
+    for issue_code, success, articles, pages, skipped_articles in results:
+        if success:
+            successful.append(issue_code)
+            stats[issue_code] = {"articles": articles,
+                                 "pages": pages,
+                                 "skipped_articles": skipped_articles}
+        else:
+            failed.append(issue_code)
 
     print(f"Completed processing {len(successful)} issues successfully, {len(failed)} failed")
 
@@ -891,25 +1651,103 @@ def batch_process_issues(issues, max_workers, input_paths, output_path, rev_date
     return successful, failed, stats
 
 # %%
-def discover_and_process_issues(input_paths, newspaper_year_codes = None):
+def get_issue_date(issue_dir, newspaper):
+    """
+    Return the date digits of an issue directory name such as CHP_19031228,
+    i.e. the digits directly after "<newspaper>_" at the start of the name.
+
+    Args:
+        issue_dir: Issue directory name
+        newspaper: Newspaper code from the tar file name
+
+    Returns:
+        String of digits, or None if the name does not start with the newspaper code and a date
+    """
+    if not issue_dir.startswith(f"{newspaper}_"):
+        return None
+    date_str = issue_dir[len(newspaper) + 1:]
+    if not date_str.isdecimal():
+        # Keep only the leading digits
+        end = 0
+        while end < len(date_str) and date_str[end].isdecimal():
+            end += 1
+        date_str = date_str[:end]
+    return date_str or None
+
+# %%
+def _discover_one(tar_path, tar_file, newspaper, year):
+    """
+    Find the issues in a single newspaper year tar.gz file.
+    Runs in a worker thread of discover_and_process_issues.
+
+    Args:
+        tar_path: Full path to the tar.gz file
+        tar_file: File name of the tar.gz file
+        newspaper: Newspaper code from the file name
+        year: Year from the file name
+
+    Returns:
+        Tuple of (dictionary mapping issue codes to their paths,
+        dictionary mapping issue codes to their total file size)
+    """
+    issues = {}
+    sizes = {}
+    try:
+        # Read the archive as a stream in a single pass, collecting the METS files
+        # and the total size of the files in each issue directory
+        mets_files = []
+        dir_sizes = {}
+        with tarfile.open(tar_path, mode = "r|gz") as tar:
+            for member in tar:
+                if not member.isfile():
+                    continue
+                if member.name.endswith("mets.xml"):
+                    mets_files.append(member)
+                member_dir = member.name.rsplit("/", 1)[0]
+                dir_sizes[member_dir] = dir_sizes.get(member_dir, 0) + member.size
+
+        for mets_file in mets_files:
+            # Extract issue code from path
+            # Path format: newspaper/year/newspaper_date/MM_01/mets.xml
+            path_parts = mets_file.name.split("/")
+            if len(path_parts) >= 4:
+                issue_dir = path_parts[-3]  # Get the newspaper_date directory
+                date_str = get_issue_date(issue_dir, newspaper)
+
+                if date_str:
+                    issue_code = f"{newspaper}_{date_str}"
+                    internal_path = f"{newspaper}/{year}/{issue_dir}/MM_01/mets.xml"
+                    issues[issue_code] = f"{tar_file}/{internal_path}"
+                    sizes[issue_code] = dir_sizes.get(mets_file.name.rsplit("/", 1)[0], 0)
+    except Exception as e:
+        logging.error(f"Problem with tar file {tar_file}: {str(e)}")
+
+    return issues, sizes
+
+def discover_and_process_issues(input_paths, newspaper_year_codes = None, issue_sizes = None):
     """
     Discover specified tar.gz files in the input directories and extract issue codes
     from their structure for processing.
+    The tar.gz files are read in parallel threads, as most of the work is
+    gzip decompression which releases the GIL.
 
     Args:
         input_paths: List of paths to the directories containing tar.gz files
         newspaper_year_codes: List of newspaper_year codes to process (optional)
+        issue_sizes: Dictionary to fill with the total file size of each issue (optional)
 
     Returns:
         Dictionary mapping issue codes to their paths
     """
-    issues = {}
+    tar_jobs = []
     for input_path in input_paths:
-        tar_files = [f for f in os.listdir(input_path) if f.endswith(".tar.gz")]
+        with os.scandir(input_path) as entries:
+            tar_files = [entry.name for entry in entries
+                         if entry.name.endswith(".tar.gz") and entry.is_file()]
 
         for tar_file in tar_files:
             tar_path = os.path.join(input_path, tar_file)
-            newspaper_year_match = re.match(r"([A-Z]+)_(\d{4})\.tar\.gz", tar_file)
+            newspaper_year_match = _TAR_RE.match(tar_file)
 
             if not newspaper_year_match:
                 logging.warning(f"Skipping file with unexpected format: {tar_file}")
@@ -922,25 +1760,16 @@ def discover_and_process_issues(input_paths, newspaper_year_codes = None):
             if newspaper_year_codes and newspaper_year_code not in newspaper_year_codes:
                 continue
 
-            try:
-                with tarfile.open(tar_path) as tar:
-                    mets_files = [m for m in tar.getmembers() if m.name.endswith("mets.xml")]
-
-                    for mets_file in mets_files:
-                        # Extract issue code from path
-                        # Path format: newspaper/year/newspaper_date/MM_01/mets.xml
-                        path_parts = mets_file.name.split("/")
-                        if len(path_parts) >= 4:
-                            issue_dir = path_parts[-3]  # Get the newspaper_date directory
-                            issue_match = re.match(fr"{newspaper}_(\d+)", issue_dir)
-
-                            if issue_match:
-                                date_str = issue_match.group(1)
-                                issue_code = f"{newspaper}_{date_str}"
-                                internal_path = f"{newspaper}/{year}/{issue_dir}/MM_01/mets.xml"
-                                issues[issue_code] = f"{tar_file}/{internal_path}"
-            except Exception as e:
-                logging.error(f"Problem with tar file {tar_file}: {str(e)}")
+            tar_jobs.append((tar_path, tar_file, newspaper, year))
+
+    issues = {}
+    if tar_jobs:
+        with ThreadPoolExecutor(max_workers = min(32, len(tar_jobs))) as executor:
+            # Merge in submission order so the issue order matches a serial scan
+            for tar_issues, tar_sizes in executor.map(lambda job: _discover_one(*job), tar_jobs):
+                issues.update(tar_issues)
+                if issue_sizes is not None:
+                    issue_sizes.update(tar_sizes)
 
     logging.info(f"Discovered {len(issues)} issues across {len(tar_files)} tar files")
 
@@ -1004,8 +1833,17 @@ def parse_arguments():
     parser.add_argument("--newspaper-codes", dest="newspaper_codes", nargs="+", default=[],
                         help="Space-separated list of newspaper codes to process (optional)")
 
+    parser.add_argument("--struct-layout", dest = "struct_layout", action = "store_true",
+                        help = "Store line and block layout values as lists of structs instead of separate columns (requires pyarrow)")
+
+    parser.add_argument("--partitioned", dest = "partitioned", action = "store_true",
+                        help = "Write the issue files into a dataset partitioned by newspaper and year (pp_issue_mets_alto_ds)")
+
     args = parser.parse_args()
 
+    if args.struct_layout and parquet_engine != "pyarrow":
+        parser.error("--struct-layout requires pyarrow")
+
     # If no date provided, use current date
     if not args.rev_date:
         args.rev_date = time.strftime("%Y%m%d")
@@ -1023,10 +1861,14 @@ def main():
     output_path = args.output_path
     rev_date = args.rev_date
 
-    os.makedirs(os.path.join(output_path, "pp_issue_mets_alto_dfs"), exist_ok=True)
+    if args.partitioned:
+        os.makedirs(os.path.join(output_path, "pp_issue_mets_alto_ds"), exist_ok=True)
+    else:
+        os.makedirs(os.path.join(output_path, "pp_issue_mets_alto_dfs"), exist_ok=True)
     os.makedirs(os.path.join(output_path, "pp_issue_processing_summaries"), exist_ok=True)
 
     issues = {}
+    issue_sizes = {}
 
     # Option 1: Process specific issues from command line
     if args.issues:
@@ -1050,16 +1892,16 @@ def main():
     elif args.newspaper_year_file:
         with open(args.newspaper_year_file, 'r') as f:
             newspaper_year_codes = [line.strip() for line in f if line.strip()]
-        issues = discover_and_process_issues(input_paths, newspaper_year_codes)
+        issues = discover_and_process_issues(input_paths, newspaper_year_codes, issue_sizes)
 
     # Option 4: Process specified newspaper codes from command line
     elif args.newspaper_codes:
         newspaper_year_codes = args.newspaper_codes
-        issues = discover_and_process_issues(input_paths, newspaper_year_codes)
+        issues = discover_and_process_issues(input_paths, newspaper_year_codes, issue_sizes)
 
     # Option 5: Process all issues in input paths
     else:
-        issues = discover_and_process_issues(input_paths)
+        issues = discover_and_process_issues(input_paths, issue_sizes = issue_sizes)
 
     print(f"Loaded {len(issues)} issues to process")
 
@@ -1069,7 +1911,10 @@ def main():
                                                      args.max_workers,
                                                      input_paths,
                                                      output_path,
-                                                     rev_date)
+                                                     rev_date,
+                                                     issue_sizes,
+                                                     args.struct_layout,
+                                                     args.partitioned)
     elapsed = time.time() - start_time
 
     issues_with_skipped_articles = [
@@ -1088,7 +1933,7 @@ def main():
         "failed": len(failed),
         "elapsed_seconds": elapsed,
         "failed_issues": failed,
-        "successful_issues": successful,
+        # The successful issues are the keys of stats
         "stats": stats,
         "issues_with_skipped_articles": issues_with_skipped_articles
     }
@@ -1099,8 +1944,12 @@ def main():
         f"summary_{time.strftime('%Y%m%d_%H%M%S')}.json"
     )
 
-    with open(summary_path, "w", encoding = "utf-8") as f:
-        json.dump(summary, f, indent=2)
+    if orjson_available:
+        with open(summary_path, "wb") as f:
+            f.write(orjson.dumps(summary, option = orjson.OPT_INDENT_2))
+    else:
+        with open(summary_path, "w", encoding = "utf-8") as f:
+            json.dump(summary, f, indent=2)
 
     # Statistics and problems
     total_articles = sum(stat["articles"] for stat in stats.values())
@@ -0,0 +1,73 @@
+import os
+import re
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from multiprocess_pp_issues_mets_alto_full import clean_text
+
+
+def reference_clean_text(text):
+    """The original regex based clean_text, which the optimised version must match."""
+    if not isinstance(text, str):
+        return "" if text is None else str(text)
+
+    text = re.sub(r'\\([\'"\n\r\t])',
+                  lambda m: ' ' if m.group(1) in 'nrt' else m.group(1),
+                  text)
+    text = re.sub(r'(\-{2,})', lambda m: f'__HYPHEN_{len(m.group(1))}__', text)
+    text = re.sub(r'(\d+\'?)(\s+)(\-+)', r'\1__NUMHYPH__\3', text)
+    text = " ".join(text.split())
+    text = re.sub(r'__HYPHEN_(\d+)__', lambda m: '-' * int(m.group(1)), text)
+    text = re.sub(r'__NUMHYPH__', '-', text)
+    text = re.sub(r'(\d+\'?)-(\-+)', r'\1-\2', text)
+
+    return text
+
+
+# Representative article text and the whitespace and hyphen edge cases the
+# single spaced fast path has to get right, with the original output
+CASES = [
+    ("The Lyttelton Times", "The Lyttelton Times"),
+    ("single spaced text.", "single spaced text."),
+    ("  leading and trailing  ", "leading and trailing"),
+    ("double  spaced", "double spaced"),
+    ("12 -", "12--"),
+    ("12 - 15", "12-- 15"),
+    ("10'   -   20", "10'-- 20"),
+    ("it's 5' - long", "it's 5'-- long"),
+    ("£5 10s - 6d", "£5 10s - 6d"),
+    ("1903 -- 1904", "1903 -- 1904"),
+    ("word -- word", "word -- word"),
+    ("---   ---", "--- ---"),
+    ("re- turned", "re- turned"),
+    ("a\xa0b", "a b"),
+    ("NBSP\xa0 and space", "NBSP and space"),
+    ("em\u2003space", "em space"),
+    ("\u2003", ""),
+    (" ", ""),
+    ("", ""),
+    ("tab\tand\nnewline", "tab and newline"),
+    ('said \\"hello\\"', 'said "hello"'),
+    ("\\n is not an escape", "\\n is not an escape"),
+    (None, ""),
+    (42, "42"),
+]
+
+
+class CleanTextTest(unittest.TestCase):
+
+    def test_cases(self):
+        for text, expected in CASES:
+            with self.subTest(text = text):
+                self.assertEqual(clean_text(text), expected)
+
+    def test_matches_reference(self):
+        for text, _ in CASES:
+            with self.subTest(text = text):
+                self.assertEqual(clean_text(text), reference_clean_text(text))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from multiprocess_pp_issues_mets_alto_full import mets2codes_inner
+
+
+def mets_issue(articles):
+    """Wrap the article divs in a minimal METS issue document."""
+    return (b'<mets:mets xmlns:mets="http://www.loc.gov/METS/"><mets:structMap>'
+            b'<mets:div TYPE="ISSUE">' + articles + b'</mets:div></mets:structMap></mets:mets>')
+
+
+class Mets2CodesTest(unittest.TestCase):
+
+    def test_article_blocks(self):
+        text = mets_issue(
+            b'<mets:div TYPE="ARTICLE" DMDID="MODSMD_ARTICLE1" LABEL="Shipping">'
+            b'<mets:div TYPE="HEADING"><mets:fptr><mets:area BEGIN="P1_TB00001"/></mets:fptr></mets:div>'
+            b'<mets:div TYPE="BODY"><mets:div TYPE="TEXT" ORDER="2"><mets:area BEGIN="P1_TB00003"/></mets:div>'
+            b'<mets:div TYPE="TEXT" ORDER="1"><mets:area BEGIN="P1_TB00002"/></mets:div></mets:div>'
+            b'<mets:div TYPE="TABLE"><mets:div TYPE="ILLUSTRATION"><mets:area BEGIN="P1_TB00005"/></mets:div>'
+            b'<mets:area BEGIN="P1_TB00004"/></mets:div>'
+            b'</mets:div>')
+        self.assertEqual(mets2codes_inner(text, "CHP_19030110"), {
+            "CHP_19030110_ARTICLE1": ("Shipping", ["P1_TB00001"],
+                                      ["P1_TB00002", "P1_TB00003", "P1_TB00004"],
+                                      ["TABLE", "ILLUSTRATION"],
+                                      {"P1_TB00002": 0, "P1_TB00003": 1, "P1_TB00004": 2}),
+        })
+
+    def test_nested_article(self):
+        text = mets_issue(
+            b'<mets:div TYPE="ARTICLE" DMDID="MODSMD_ARTICLE0">'
+            b'<mets:div TYPE="TEXT"><mets:area BEGIN="P1_TB00001"/></mets:div>'
+            b'<mets:div TYPE="ARTICLE" DMDID="MODSMD_ARTICLE1">'
+            b'<mets:div TYPE="TEXT"><mets:area BEGIN="P1_TB00002"/></mets:div></mets:div>'
+            b'</mets:div>')
+        articles = mets2codes_inner(text, "X")
+        self.assertEqual(list(articles), ["X_ARTICLE0", "X_ARTICLE1"])
+        self.assertEqual(articles["X_ARTICLE0"][2], ["P1_TB00001", "P1_TB00002"])
+        self.assertEqual(articles["X_ARTICLE0"][3], ["TEXT", "ARTICLE"])
+
+    def test_divs_below_recovered_elements(self):
+        # Recover mode turns the broken tag into <me/> followed by a ts:div element,
+        # so the TEXT div is no longer a direct child of a mets:div
+        text = mets_issue(
+            b'<mets:div TYPE="ARTICLE" DMDID="MODSMD_ARTICLE0"><me<ts:div TYPE="TABLE">'
+            b'<mets:div TYPE="TEXT" ORDER="2"><mets:area BEGIN="P1_CB00006"/></mets:div>'
+            b'</mets:div></mets:div>')
+        self.assertEqual(mets2codes_inner(text, "X"), {
+            "X_ARTICLE0": ("UNTITLED", [], ["P1_CB00006"], [], {"P1_CB00006": 0}),
+        })
+
+    def test_stray_tag_start_between_articles(self):
+        text = mets_issue(b' < '.join(
+            b'<mets:div TYPE="ARTICLE" DMDID="MODSMD_ARTICLE%d"><mets:div TYPE="TEXT">'
+            b'<mets:area BEGIN="P1_TB0000%d"/></mets:div></mets:div>' % (i, i)
+            for i in (1, 2, 3)))
+        self.assertEqual(list(mets2codes_inner(text, "X")), ["X_ARTICLE1", "X_ARTICLE2", "X_ARTICLE3"])
+
+
+if __name__ == "__main__":
+    unittest.main()